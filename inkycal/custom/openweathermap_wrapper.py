@@ -14,6 +14,7 @@ from typing import Literal
 
 import requests
 from dateutil import tz
+from requests.adapters import HTTPAdapter
 
 TEMP_UNITS = Literal["celsius", "fahrenheit"]
 WIND_UNITS = Literal["meters_sec", "km_hour", "miles_hour", "knots", "beaufort"]
@@ -31,8 +32,8 @@ def is_timestamp_within_range(timestamp: datetime, start_time: datetime, end_tim
     return start_time <= timestamp <= end_time
 
 
-def get_json_from_url(request_url):
-    response = requests.get(request_url)
+def get_json_from_url(request_url, session: requests.Session = None):
+    response = (session or requests).get(request_url)
     if not response.ok:
         raise AssertionError(
             f"Failure getting the current weather: code {response.status_code}. Reason: {response.text}"
@@ -43,7 +44,8 @@ def get_json_from_url(request_url):
 class OpenWeatherMap:
     def __init__(self, api_key: str, city_id: int = None, lat: float = None, lon: float = None,
                  api_version: API_VERSIONS = "2.5", temp_unit: TEMP_UNITS = "celsius",
-                 wind_unit: WIND_UNITS = "meters_sec", language: str = "en", tz_name: str = "UTC") -> None:
+                 wind_unit: WIND_UNITS = "meters_sec", language: str = "en", tz_name: str = "UTC",
+                 session: requests.Session = None) -> None:
         self.api_key = api_key
         self.temp_unit = temp_unit
         self.wind_unit = wind_unit
@@ -56,6 +58,14 @@ class OpenWeatherMap:
         )
 
         self.tz_zone = tz.gettz(tz_name)
+
+        # Reuse connections to the API instead of a new TCP and TLS handshake per request.
+        # The pool allows a few parallel requests, e.g. current weather and daily forecasts.
+        if session is None:
+            session = requests.Session()
+            session.headers["Accept-Encoding"] = "gzip, deflate"
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=5))
+        self.session = session
         logger.info(
             f"OWM wrapper initialized for API version {self._api_version}, language {self.language} and timezone {tz_name}."
         )
@@ -67,16 +77,16 @@ class OpenWeatherMap:
             # Gets current weather status from the 2.5 API: https://openweathermap.org/current
             # This is primarily using the 2.5 API since the 3.0 API actually has less info
             weather_url = f"{API_BASE_URL}/2.5/weather?{self.location_substring}&appid={self.api_key}&units=Metric&lang={self.language}"
-            weather_data = get_json_from_url(weather_url)
+            weather_data = get_json_from_url(weather_url, self.session)
             # Only if we do have a 3.0 API-enabled key, we can also get the UVI reading from that endpoint: https://openweathermap.org/api/one-call-3
             if self._api_version == "3.0":
                 weather_url = f"{API_BASE_URL}/3.0/onecall?{self.location_substring}&appid={self.api_key}&exclude=minutely,hourly,daily&units=Metric&lang={self.language}"
-                weather_data["uvi"] = get_json_from_url(weather_url)["current"]["uvi"]
+                weather_data["uvi"] = get_json_from_url(weather_url, self.session)["current"]["uvi"]
         elif weather == "forecast":
             # Gets weather forecasts from the 2.5 API: https://openweathermap.org/forecast5
             # This is only using the 2.5 API since the 3.0 API actually has less info
             weather_url = f"{API_BASE_URL}/2.5/forecast?{self.location_substring}&appid={self.api_key}&units=Metric&lang={self.language}"
-            weather_data = get_json_from_url(weather_url)["list"]
+            weather_data = get_json_from_url(weather_url, self.session)["list"]
         return weather_data
 
     def get_current_weather(self) -> Dict:
@@ -0,0 +1,78 @@
+"""
+Floyd-Steinberg dithering for Inkycal's three-colour palettes
+Compiled with numba if it is installed, which is a lot faster than Pillow's
+generic quantize for palettes with only three colours.
+
+Copyright by aceinnolab
+"""
+import numpy
+
+# numba is optional, it is not available on every platform Inkycal runs on.
+# If it is not found, fs_dither_bwr is None and Pillow's quantize is used instead.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _fs_dither_bwr(image: numpy.ndarray, colour: numpy.ndarray) -> numpy.ndarray:
+    """Dithers an image to white, black and one colour with Floyd-Steinberg.
+
+    Args:
+        - image: float32 array of shape (height, width, 3) with RGB values.
+          The array is used as a working buffer and modified in place.
+        - colour: float32 array with the RGB values of the third colour.
+
+    Returns:
+        - uint8 array of shape (height, width) with the palette index of each
+          pixel: 0 for white, 1 for black and 2 for the colour.
+    """
+    height, width = image.shape[0], image.shape[1]
+    indices = numpy.empty((height, width), dtype=numpy.uint8)
+
+    for y in range(height):
+        for x in range(width):
+            # clip the pixel with the accumulated error to the valid range
+            r = min(max(image[y, x, 0], 0.0), 255.0)
+            g = min(max(image[y, x, 1], 0.0), 255.0)
+            b = min(max(image[y, x, 2], 0.0), 255.0)
+
+            # find the nearest palette colour by squared distance
+            d_white = (r - 255.0) ** 2 + (g - 255.0) ** 2 + (b - 255.0) ** 2
+            d_black = r ** 2 + g ** 2 + b ** 2
+            d_colour = (r - colour[0]) ** 2 + (g - colour[1]) ** 2 + (b - colour[2]) ** 2
+
+            if d_white <= d_black and d_white <= d_colour:
+                index, nr, ng, nb = 0, 255.0, 255.0, 255.0
+            elif d_black <= d_colour:
+                index, nr, ng, nb = 1, 0.0, 0.0, 0.0
+            else:
+                index, nr, ng, nb = 2, colour[0], colour[1], colour[2]
+            indices[y, x] = index
+
+            # distribute the quantization error to the neighbouring pixels
+            er, eg, eb = r - nr, g - ng, b - nb
+            if x + 1 < width:
+                image[y, x + 1, 0] += er * 7 / 16
+                image[y, x + 1, 1] += eg * 7 / 16
+                image[y, x + 1, 2] += eb * 7 / 16
+            if y + 1 < height:
+                if x > 0:
+                    image[y + 1, x - 1, 0] += er * 3 / 16
+                    image[y + 1, x - 1, 1] += eg * 3 / 16
+                    image[y + 1, x - 1, 2] += eb * 3 / 16
+                image[y + 1, x, 0] += er * 5 / 16
+                image[y + 1, x, 1] += eg * 5 / 16
+                image[y + 1, x, 2] += eb * 5 / 16
+                if x + 1 < width:
+                    image[y + 1, x + 1, 0] += er * 1 / 16
+                    image[y + 1, x + 1, 1] += eg * 1 / 16
+                    image[y + 1, x + 1, 2] += eb * 1 / 16
+
+    return indices
+
+
+if numba is not None:
+    fs_dither_bwr = numba.njit(cache=True, fastmath=True)(_fs_dither_bwr)
+else:
+    fs_dither_bwr = None
@@ -5,17 +5,46 @@ images.
 
 Copyright by aceinnolab
 """
+import functools
+import hashlib
+import io
 import logging
 import os
+import time
 from typing import Literal
+from typing import Tuple
 
 import numpy
 import PIL
 import requests
 from PIL import Image
+from PIL import ImageOps
+
+from inkycal.modules._dither import fs_dither_bwr
+from inkycal.settings import Settings
+from inkycal.utils import JSONCache
 
 logger = logging.getLogger(__name__)
 
+settings = Settings()
+
+# seconds after which an unused image downloaded from a URL is removed from the cache
+URL_CACHE_MAX_AGE = 7 * 24 * 3600
+
+
+def _cached_file_path(url: str) -> str:
+    """Returns the path of the cached copy of a downloaded file"""
+    return os.path.join(settings.CACHE_PATH, f"image_{hashlib.sha1(url.encode()).hexdigest()}")
+
+
+def _remove_unused_files(entries: dict) -> None:
+    """Removes cached copies of downloaded files which have no cache entry"""
+    used = {_cached_file_path(url) for url in entries}
+    for name in os.listdir(settings.CACHE_PATH):
+        path = os.path.join(settings.CACHE_PATH, name)
+        if name.startswith("image_") and path not in used:
+            os.remove(path)
+
 
 class Inkyimage:
     """Custom Imgae class written for commonly used image operations."""
@@ -27,14 +56,17 @@ class Inkyimage:
         self.image = image
 
         # give an OK message
-        logger.debug(f"{__name__} loaded")
+        logger.debug("%s loaded", __name__)
 
-    def load(self, path: str) -> None:
+    def load(self, path: str, target_size: Tuple[int, int] = None) -> None:
         """loads an image from a URL or filepath.
 
         Args:
           - path:The full path or url of the image file
             e.g. `https://sample.com/logo.png` or `/home/pi/Downloads/nice_pic.png`
+          - target_size:->(width, height). Optional size the image will be resized
+            to later on. JPEG images are then decoded at a reduced scale which is
+            still at least twice this size, which is much faster for large photos.
 
         Raises:
           - FileNotFoundError: This Exception is raised when the file could not be
@@ -47,7 +79,8 @@ class Inkyimage:
         try:
             if path.startswith("http"):
                 logger.info("loading image from URL")
-                image = Image.open(requests.get(path, stream=True).raw)
+                # download the whole file first, so the decoder reads from memory
+                image = Image.open(io.BytesIO(self._download(path)))
             else:
                 logger.info("loading image from local path")
                 image = Image.open(path)
@@ -59,12 +92,88 @@ class Inkyimage:
             logger.error("Invalid Image file provided", exc_info=True)
             raise Exception("Please check if the path points to an image file.")
 
-        logger.debug(f"width: {image.width}, height: {image.height}")
+        if target_size and image.format == "JPEG":
+            width, height = target_size
+            image.draft("RGB", (width * 2, height * 2))
+
+        logger.debug("width: %d, height: %d", image.width, image.height)
 
-        image.convert(mode="RGBA")  # convert to a more suitable format
         self.image = image
         logger.info("loaded Image")
 
+    @staticmethod
+    def _download(url: str) -> bytes:
+        """Downloads a file, reusing the cached copy if it did not change.
+
+        The ETag and Last-Modified headers of the previous download are sent
+        along with the request. If the server answers with `304 Not Modified`,
+        the file is read from the cache instead of being downloaded again.
+        Cached files which were not used for a week are removed.
+
+        Args:
+          - url: The url of the file.
+
+        Returns:
+          - The content of the file.
+        """
+        cache, entries = None, {}
+        try:
+            cache = JSONCache("inkycal_image_urls")
+            entries = cache.read()
+        except (OSError, ValueError):
+            # a broken index is replaced by the next write
+            logger.warning("Could not read the image cache, downloading without it", exc_info=True)
+
+        entry = entries.get(url)
+        file_path = _cached_file_path(url)
+
+        headers = {}
+        if entry and os.path.isfile(file_path):
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = requests.get(url, headers=headers, timeout=10)
+        now = time.time()
+
+        if response.status_code == 304:
+            logger.info("image not modified, using cached copy")
+            with open(file_path, "rb") as file:
+                content = file.read()
+            # only record the use once a day, to spare the SD card
+            changed = now - entry.get("used", 0) > 24 * 3600
+            if changed:
+                entry["used"] = now
+        else:
+            response.raise_for_status()
+            content = response.content
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            # a copy without validators can't be revalidated, so a stale one is dropped
+            changed = entry is not None or bool(etag or last_modified)
+            entries.pop(url, None)
+            if etag or last_modified:
+                entries[url] = {"etag": etag, "last_modified": last_modified, "used": now}
+
+        if cache is None:
+            return content
+
+        expired = [key for key, value in entries.items() if now - value.get("used", now) > URL_CACHE_MAX_AGE]
+        if changed or expired:
+            try:
+                if url in entries and response.status_code != 304:
+                    with open(file_path, "wb") as file:
+                        file.write(content)
+                for key in expired:
+                    del entries[key]
+                cache.write(entries)
+                _remove_unused_files(entries)
+            except OSError:
+                logger.warning("Could not cache downloaded image", exc_info=True)
+
+        return content
+
     def clear(self):
         """Removes currently saved image if present."""
         if self.image:
@@ -92,9 +201,13 @@ class Inkyimage:
                 logger.error("Angle must be a multiple of 90")
                 return
 
+            # a full turn leaves the image unchanged, no need to rotate it
+            if angle % 360 == 0:
+                return
+
             image = image.rotate(angle, expand=True)
             self.image = image
-            logger.info(f"flipped image by {angle} degrees")
+            logger.info("flipped image by %d degrees", angle)
 
     def autoflip(self, layout: str) -> None:
         """flips the image automatically to the given layout.
@@ -138,14 +251,39 @@ class Inkyimage:
 
             if len(image.getbands()) == 4:
                 logger.info("removing alpha channel")
-                bg = Image.new("RGBA", (image.width, image.height), "white")
-                im = Image.alpha_composite(bg, image)
-
-                self.image.paste(im, (0, 0))
+                x = numpy.asarray(image.convert("RGBA"))
+                rgb, alpha = x[:, :, :3], x[:, :, 3:]
+
+                # blend each pixel over white: rgb * a/255 + 255 * (255 - a)/255
+                # uint16 is just wide enough, the sum never exceeds 255 * 255 + 127
+                blend = numpy.multiply(rgb, alpha, dtype=numpy.uint16)
+                background = numpy.subtract(255, alpha, dtype=numpy.uint16)
+                background *= 255
+                background += 127
+                blend += background
+                blend //= 255
+
+                out = numpy.empty_like(x)
+                out[:, :, :3] = blend
+                out[:, :, 3] = 255
+
+                self.image = Image.fromarray(out, "RGBA")
                 logger.info("removed transparency")
 
-    def resize(self, width=None, height=None):
-        """Resize an image to desired width or height"""
+    def resize(self, width=None, height=None, resample=Image.BICUBIC):
+        """Resize an image to desired width or height
+
+        If both width and height are given, the image is scaled to fit inside
+        that box, keeping its aspect ratio. If only one is given, the other side
+        is scaled by the same factor.
+
+        Args:
+          - width:->int. The desired width in pixels.
+          - height:->int. The desired height in pixels.
+          - resample: The PIL resampling filter to use. Bicubic is used by default,
+            as the image is usually mapped to a few colours afterwards, which hides
+            the difference to the (slower) Lanczos filter.
+        """
         if self._image_loaded():
 
             if not width and not height:
@@ -154,20 +292,27 @@ class Inkyimage:
 
             image = self.image
 
-            if width:
+            if width and height:
+                initial_size = image.size
+                # scale once, so the image fits inside the given box
+                image = ImageOps.contain(image, (width, height), method=resample)
+                logger.info("resized image from %s to %s", initial_size, image.size)
+                self.image = image
+
+            elif width:
                 initial_width = image.width
                 wpercent = width / float(image.width)
                 hsize = int((float(image.height) * float(wpercent)))
-                image = image.resize((width, hsize), Image.LANCZOS)
-                logger.info(f"resized image from {initial_width} to {image.width}")
+                image = image.resize((width, hsize), resample)
+                logger.info("resized image from %d to %d", initial_width, image.width)
                 self.image = image
 
-            if height:
+            elif height:
                 initial_height = image.height
                 hpercent = height / float(image.height)
                 wsize = int(float(image.width) * float(hpercent))
-                image = image.resize((wsize, height), Image.LANCZOS)
-                logger.info(f"resized image from {initial_height} to {image.height}")
+                image = image.resize((wsize, height), resample)
+                logger.info("resized image from %d to %d", initial_height, image.height)
                 self.image = image
 
     @staticmethod
@@ -185,127 +330,187 @@ class Inkyimage:
           - A single image.
         """
 
-        def clear_white(img):
-            """Replace all white pixels from image with transparent pixels"""
-            x = numpy.asarray(img.convert("RGBA")).copy()
-            x[:, :, 3] = (255 * (x[:, :, :3] != 255).any(axis=2)).astype(numpy.uint8)
-            return Image.fromarray(x)
+        if image2.mode not in ("RGB", "RGBA") or image1.mode == "RGBA":
+            # merged pixels are opaque, regardless of the second image's alpha
+            image2 = image2.convert("RGB")
 
-        image2 = clear_white(image2)
-        image1.paste(image2, (0, 0), image2)
+        # A pixel is white if its darkest channel is 255, only the non-white
+        # pixels of the second image are merged
+        pixels = numpy.asarray(image2)
+        darkest = numpy.minimum(pixels[:, :, 0], pixels[:, :, 1])
+        numpy.minimum(darkest, pixels[:, :, 2], out=darkest)
+        mask = Image.fromarray(darkest != 255)
+
+        # paste the non-white pixels directly into the first image
+        image1.paste(image2, (0, 0), mask)
         logger.info("merged given images into one")
 
         return image1
 
 
-def image_to_palette(
-    image: Image, palette: Literal = ["bwr", "bwy", "bw", "16gray"], dither: bool = True
-) -> (PIL.Image, PIL.Image):
-    """Maps an image to a given colour palette.
+# Palettes for quantizing, as the 768 values (256 colours) putpalette expects
+palettes = {
+    # black-white-red palette, unused colours are filled with black
+    "bwr": bytes([255, 255, 255, 0, 0, 0, 255, 0, 0] + [0, 0, 0] * 253),
+    # black-white-yellow palette, unused colours are filled with black
+    "bwy": bytes([255, 255, 255, 0, 0, 0, 255, 255, 0] + [0, 0, 0] * 253),
+    # 16 shades of gray, repeated 16 times
+    "16gray": bytes([x for x in range(0, 256, 16) for _ in range(3)] * 16),
+}
 
-    Maps each pixel from the image to a colour from the palette.
+
+@functools.lru_cache(maxsize=8)
+def _get_palette(palette: str) -> (PIL.Image, numpy.ndarray, numpy.ndarray, numpy.ndarray):
+    """Creates the palette image and band lookup-tables for a palette token.
+
+    These only depend on the palette token, so they are created once and
+    reused for every image mapped to the same palette.
 
     Args:
-        - palette: A supported token. (see below)
-        - dither:->bool. Use dithering? Set to `False` for solid colour fills.
+        - palette: A supported token, except 'bw' which needs no palette.
 
     Returns:
-        - two images: one for the coloured band and one for the black band.
+        - the palette image to quantize with and two lookup-tables, mapping
+          each palette index to a gray value of the black and colour band.
+        - the float32 RGB values of the third palette entry, the colour used
+          by the dithering kernel for 'bwr' and 'bwy'.
 
     Raises:
         - ValueError if palette token is not supported
+    """
 
-    Supported palette tokens:
+    if palette not in palettes:
+        logger.error("The given palette is unsupported.")
+        raise ValueError(f"The given palette ({palette}) is not supported.")
 
-    >>> 'bwr' # black-white-red
-    >>> 'bwy' # black-white-yellow
-    >>> 'bw'  # black-white
-    >>> '16gray' # 16 shades of gray
-    """
+    pal = palettes[palette]
 
-    if palette == "bwr":
-        # black-white-red palette
-        pal = [255, 255, 255, 0, 0, 0, 255, 0, 0]
+    # Create a dummy image to be used as a palette
+    palette_im = Image.new("P", (1, 1))
+    palette_im.putpalette(pal)
 
-    elif palette == "bwy":
-        # black-white-yellow palette
-        pal = [255, 255, 255, 0, 0, 0, 255, 255, 0]
+    # RGB value of each of the 256 palette entries
+    palette_rgb = numpy.frombuffer(pal, dtype=numpy.uint8).reshape(-1, 3)
 
-    elif palette == "bw":
-        pal = None
-    elif palette == "16gray":
-        pal = [x for x in range(0, 256, 16)] * 3
-        pal.sort()
+    # get rgb of the non-black-white colour from the palette
+    rgb = [col for col in palette_rgb.tolist() if col != [0, 0, 0] and col != [255, 255, 255]][0]
+    r_col, g_col, b_col = rgb
 
-    else:
-        logger.error("The given palette is unsupported.")
-        raise ValueError(f"The given palette ({palette}) is not supported.")
+    # Create a lookup-table for the black band
+    lut_black = palette_rgb.copy()
+    r, g, b = lut_black[:, 0], lut_black[:, 1], lut_black[:, 2]
+
+    # convert coloured pixels to white
+    lut_black[numpy.logical_and(r == r_col, g == g_col)] = [255, 255, 255]
 
-    if pal:
-        # The palette needs to have 256 colors, for this, the black-colour
-        # is added until the
-        colours = len(pal) // 3
-        # print(f'The palette has {colours} colours')
+    # Create a lookup-table for the colour band
+    lut_colour = palette_rgb.copy()
+    r, g, b = lut_colour[:, 0], lut_colour[:, 1], lut_colour[:, 2]
 
-        if 256 % colours != 0:
-            # print('Filling palette with black')
-            pal += (256 % colours) * [0, 0, 0]
+    # convert black pixels to white
+    lut_colour[numpy.logical_and(r == 0, g == 0)] = [255, 255, 255]
 
-        # print(pal)
-        colours = len(pal) // 3
-        # print(f'The palette now has {colours} colours')
+    # convert non-white pixels to black
+    lut_colour[numpy.logical_and(g == g_col, b == 0)] = [0, 0, 0]
 
-        # Create a dummy image to be used as a palette
-        palette_im = Image.new("P", (1, 1))
+    # All entries of the lookup-tables are shades of gray, so a single
+    # band per table is enough to reconstruct both images
+    lut_black = lut_black[:, 0].copy()
+    lut_colour = lut_colour[:, 0].copy()
 
-        # Attach the created palette. The palette should have 256 colours
-        # equivalent to 768 integers
-        palette_im.putpalette(pal * (256 // colours))
+    # the palette order is white, black, colour
+    colour = palette_rgb[2].astype(numpy.float32)
 
-        # Quantize the image to given palette
-        quantized_im = image.quantize(palette=palette_im, dither=dither)
-        quantized_im = quantized_im.convert("RGB")
+    # the tables are shared between calls, make sure they stay unchanged
+    lut_black.setflags(write=False)
+    lut_colour.setflags(write=False)
+    colour.setflags(write=False)
 
-        # get rgb of the non-black-white colour from the palette
-        rgb = [pal[x : x + 3] for x in range(0, len(pal), 3)]
-        rgb = [col for col in rgb if col != [0, 0, 0] and col != [255, 255, 255]][0]
-        r_col, g_col, b_col = rgb
-        # print(f'r:{r_col} g:{g_col} b:{b_col}')
+    return palette_im, lut_black, lut_colour, colour
 
-        # Create an image buffer for black pixels
-        buffer1 = numpy.array(quantized_im)
 
-        # Get RGB values of each pixel
-        r, g, b = buffer1[:, :, 0], buffer1[:, :, 1], buffer1[:, :, 2]
+def _pack_bits(band: numpy.ndarray) -> numpy.ndarray:
+    """Packs a black and white band to one bit per pixel.
 
-        # convert coloured pixels to white
-        buffer1[numpy.logical_and(r == r_col, g == g_col)] = [255, 255, 255]
+    Uses the layout of the e-paper drivers' buffers: the most significant bit
+    is the leftmost pixel, 1 is white and 0 is black. Rows are padded with
+    white pixels to a multiple of 8.
+    """
+    bits = band != 0
+    padding = -bits.shape[1] % 8
+    if padding:
+        bits = numpy.pad(bits, ((0, 0), (0, padding)), constant_values=True)
+    return numpy.packbits(bits, axis=1)
 
-        # reconstruct image for black-band
-        im_black = Image.fromarray(buffer1)
 
-        # Create a buffer for coloured pixels
-        buffer2 = numpy.array(quantized_im)
+def image_to_palette(
+    image: Image, palette: Literal = ["bwr", "bwy", "bw", "16gray"], dither: bool = True, raw: bool = False
+) -> (PIL.Image, PIL.Image):
+    """Maps an image to a given colour palette.
+
+    Maps each pixel from the image to a colour from the palette.
+
+    Args:
+        - palette: A supported token. (see below)
+        - dither:->bool. Use dithering? Set to `False` for solid colour fills.
+        - raw:->bool. Return the bands as bit-packed numpy arrays (one bit per
+          pixel, 1 for white) instead of images. Not supported for '16gray'.
 
-        # Get RGB values of each pixel
-        r, g, b = buffer2[:, :, 0], buffer2[:, :, 1], buffer2[:, :, 2]
+    Returns:
+        - two images: one for the coloured band and one for the black band.
+          With `raw`, two uint8 arrays of shape (height, ceil(width / 8)) instead.
 
-        # convert black pixels to white
-        buffer2[numpy.logical_and(r == 0, g == 0)] = [255, 255, 255]
+    Raises:
+        - ValueError if palette token is not supported
 
-        # convert non-white pixels to black
-        buffer2[numpy.logical_and(g == g_col, b == 0)] = [0, 0, 0]
+    Supported palette tokens:
 
-        # reconstruct image for colour-band
-        im_colour = Image.fromarray(buffer2)
+    >>> 'bwr' # black-white-red
+    >>> 'bwy' # black-white-yellow
+    >>> 'bw'  # black-white
+    >>> '16gray' # 16 shades of gray
+    """
 
-        # self.preview(im_black)
-        # self.preview(im_colour)
+    if raw and palette == "16gray":
+        raise ValueError("Raw output is only supported for black and white bands.")
 
-    else:
+    if palette == "bw":
         im_black = image.convert("1", dither=dither)
         im_colour = Image.new(mode="1", size=im_black.size, color="white")
 
+        if raw:
+            return _pack_bits(numpy.asarray(im_black)), _pack_bits(numpy.asarray(im_colour))
+
+    else:
+        palette_im, lut_black, lut_colour, colour = _get_palette(palette)
+
+        if dither and palette in ("bwr", "bwy") and fs_dither_bwr is not None:
+            # Dither with the compiled kernel, its indices match the palette order
+            indices = fs_dither_bwr(numpy.array(image.convert("RGB"), dtype=numpy.float32), colour)
+        else:
+            # Quantize the image to given palette, keeping the palette indices.
+            # Without dithering, Pillow's cached palette lookup is much faster than
+            # a nearest-colour search in numpy, even for three colours.
+            quantized_im = image.quantize(palette=palette_im, dither=dither)
+            indices = numpy.asarray(quantized_im)
+
+        black_band = lut_black[indices]
+        colour_band = lut_colour[indices]
+
+        if raw:
+            logger.info("mapped image to specified palette")
+            return _pack_bits(black_band), _pack_bits(colour_band)
+
+        # reconstruct images for black-band and colour-band
+        im_black = Image.fromarray(black_band, mode="L")
+        im_colour = Image.fromarray(colour_band, mode="L")
+
+        # Apart from the gray shades, the bands are pure black and white, which
+        # is the 1-bit mode the e-paper drivers expect
+        if palette != "16gray":
+            im_black = im_black.convert("1", dither=Image.Dither.NONE)
+            im_colour = im_colour.convert("1", dither=Image.Dither.NONE)
+
     logger.info("mapped image to specified palette")
 
     return im_black, im_colour
@@ -2,6 +2,10 @@
 Inkycal Image Module
 Copyright by aceinnolab
 """
+import os
+
+from PIL import Image
+
 from inkycal.custom import *
 from inkycal.modules.inky_image import image_to_palette
 from inkycal.modules.inky_image import Inkyimage as Images
@@ -9,6 +13,23 @@ from inkycal.modules.template import inkycal_module
 
 logger = logging.getLogger(__name__)
 
+resample_filters = {
+    "bilinear": Image.BILINEAR,
+    "bicubic": Image.BICUBIC,
+    "lanczos": Image.LANCZOS,
+}
+
+
+def get_resample(palette: str, config: dict) -> int:
+    """Returns the filter for resizing images, from the optional resample setting.
+
+    Lanczos keeps gray shades sharper, the difference is lost with fewer colours,
+    so it is only the default for the 16gray palette.
+    """
+    if config.get("resample") in resample_filters:
+        return resample_filters[config["resample"]]
+    return Image.LANCZOS if palette == "16gray" else Image.BICUBIC
+
 
 class Inkyimage(inkycal_module):
     """Displays an image from URL or local path"""
@@ -26,6 +47,8 @@ class Inkyimage(inkycal_module):
     optional = {
         "autoflip": {"label": "Should the image be flipped automatically?", "options": [True, False]},
         "orientation": {"label": "Please select the desired orientation", "options": ["vertical", "horizontal"]},
+        "resample": {"label": "Which filter should be used for resizing images?",
+                     "options": ["bicubic", "lanczos", "bilinear"]},
     }
 
     def __init__(self, config):
@@ -49,6 +72,12 @@ class Inkyimage(inkycal_module):
         if "dither" in config and config["dither"] == False:
             self.dither = False
 
+        self.resample = get_resample(self.palette, config)
+
+        # last resized image, reused while the image file is unchanged
+        self._cache_key = None
+        self._cached_image = None
+
         # give an OK message
         logger.debug(f"{__name__} loaded")
 
@@ -62,27 +91,45 @@ class Inkyimage(inkycal_module):
 
         logger.info(f"Image size: {im_size}")
 
-        # initialize custom image class
-        im = Images()
+        # A local image which was not modified since the last refresh does not
+        # need to be decoded and resized again for the same size
+        cache_key = None
+        if not self.path.startswith("http") and os.path.isfile(self.path):
+            cache_key = (os.path.getmtime(self.path), im_size)
 
-        # use the image at the first index
-        im.load(self.path)
+        if cache_key is not None and cache_key == self._cache_key:
+            logger.info("image unchanged, using previously resized image")
+            image = self._cached_image
 
-        # Remove background if present
-        im.remove_alpha()
+        else:
+            # initialize custom image class
+            im = Images()
 
-        # if auto-flip was enabled, flip the image
-        if self.autoflip:
-            im.autoflip(self.orientation)
+            # the image may be flipped later on, so use the longer side for both axes
+            max_side = max(im_width, im_height)
 
-        # resize the image so it can fit on the epaper
-        im.resize(width=im_width, height=im_height)
+            # use the image at the first index
+            im.load(self.path, target_size=(max_side, max_side))
 
-        # convert images according to specified palette
-        im_black, im_colour = image_to_palette(image=im.image.convert("RGB"), palette=self.palette, dither=self.dither)
+            # Remove background if present
+            im.remove_alpha()
+
+            # if auto-flip was enabled, flip the image
+            if self.autoflip:
+                im.autoflip(self.orientation)
+
+            # resize the image so it can fit on the epaper
+            im.resize(width=im_width, height=im_height, resample=self.resample)
+
+            image = im.image.convert("RGB")
 
-        # with the images now send, clear the current image
-        im.clear()
+            # with the image now resized, clear the current image
+            im.clear()
+
+            self._cache_key, self._cached_image = cache_key, image
+
+        # convert images according to specified palette
+        im_black, im_colour = image_to_palette(image=image, palette=self.palette, dither=self.dither)
 
         # return images
         return im_black, im_colour
@@ -7,6 +7,7 @@ import glob
 from inkycal.custom import *
 # PIL has a class named Image, use alias for Inkyimage -> Images
 from inkycal.modules.inky_image import Inkyimage as Images, image_to_palette
+from inkycal.modules.inkycal_image import get_resample
 from inkycal.modules.template import inkycal_module
 from inkycal.utils import JSONCache
 
@@ -41,6 +42,11 @@ class Slideshow(inkycal_module):
         "orientation": {
             "label": "Please select the desired orientation",
             "options": ["vertical", "horizontal"]
+        },
+
+        "resample": {
+            "label": "Which filter should be used for resizing images?",
+            "options": ["bicubic", "lanczos", "bilinear"]
         }
     }
 
@@ -61,6 +67,7 @@ class Slideshow(inkycal_module):
         self.palette = config['palette']
         self.autoflip = config['autoflip']
         self.orientation = config['orientation']
+        self.resample = get_resample(self.palette, config)
 
         # Get the full path of all png/jpg/jpeg images in the given folder
         all_files = glob.glob(f'{self.path}/*')
@@ -107,8 +114,11 @@ class Slideshow(inkycal_module):
         # temporary print method, prints current filename
         print(f'slideshow - current image name: {self.images[0].split("/")[-1]}')
 
+        # the image may be flipped later on, so use the longer side for both axes
+        max_side = max(im_width, im_height)
+
         # use the image at the first index
-        im.load(self.images[0])
+        im.load(self.images[0], target_size=(max_side, max_side))
 
         # Remove background if present
         im.remove_alpha()
@@ -118,7 +128,7 @@ class Slideshow(inkycal_module):
             im.autoflip(self.orientation)
 
         # resize the image so it can fit on the epaper
-        im.resize(width=im_width, height=im_height)
+        im.resize(width=im_width, height=im_height, resample=self.resample)
 
         # convert images according to specified palette
         im_black, im_colour = image_to_palette(im.image.convert("RGB"), self.palette)
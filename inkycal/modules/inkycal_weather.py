@@ -2,9 +2,14 @@
 Inkycal weather module
 Copyright by aceinnolab
 """
-import decimal
+import functools
 import logging
 import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from datetime import datetime
+from datetime import timezone
 from typing import Tuple
 
 import arrow
@@ -25,6 +30,179 @@ logger = logging.getLogger(__name__)
 logger.setLevel(level=logging.INFO)
 
 
+@functools.lru_cache(maxsize=64)
+def _load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """Loads a truetype font once per (path, size) instead of on every icon"""
+    return ImageFont.truetype(path, size)
+
+
+@functools.lru_cache(maxsize=128)
+def _fit_font_size(path: str, text: str, box_width: int, box_height: int) -> int:
+    """Returns the smallest font size (min. 8) at which text fills 90% of the box width or height"""
+    target_width, target_height = int(box_width * 0.9), int(box_height * 0.9)
+
+    def fills_box(size):
+        text_width, text_height = _load_font(path, size).getbbox(text)[2:]
+        return text_width >= target_width or text_height >= target_height
+
+    # Glyph metrics scale (almost) linearly with the font size, so estimate
+    # the size from one measurement and correct the rounding by single steps
+    probe_size = 40
+    probe_width, probe_height = _load_font(path, probe_size).getbbox(text)[2:]
+    scale = min(target_width / max(probe_width, 1), target_height / max(probe_height, 1))
+    size = max(8, math.ceil(probe_size * scale))
+
+    while size > 8 and fills_box(size - 1):
+        size -= 1
+    while not fills_box(size):
+        size += 1
+
+    return size
+
+
+# Moonphase-icons for each eighth of a lunation
+MOON_PHASE_ICONS = {
+    0: '\uf095',
+    1: '\uf099',
+    2: '\uf09c',
+    3: '\uf0a0',
+    4: '\uf0a3',
+    5: '\uf0a7',
+    6: '\uf0aa',
+    7: '\uf0ae'
+}
+
+
+# Reference date for the moon phase calculation
+MOON_PHASE_EPOCH = datetime(2001, 1, 1, tzinfo=timezone.utc)
+
+
+def _moon_index(days: float) -> int:
+    """Returns the eighth of the lunation (0-7) days after the moon phase epoch"""
+    # Plain Python on purpose: this runs once per refresh, so numba's dispatch
+    # and cache loading would cost far more than these few float operations
+    lunations = 0.20439731 + (days * 0.03386319269)
+    position = lunations % 1.0
+    return math.floor((position * 8) + 0.5) & 7
+
+
+def get_moon_phase(now: datetime) -> str:
+    """Calculate the current (approximate) moon phase
+
+    Args:
+        - now:
+            the current time (timezone-aware)
+
+    Returns:
+        The corresponding moonphase-icon.
+    """
+
+    diff = now - MOON_PHASE_EPOCH
+    return MOON_PHASE_ICONS[_moon_index(diff.days + (diff.seconds / 86400.0))]
+
+
+def format_time_12h(dt: datetime) -> str:
+    """Formats a time like 7:05 am, without a leading zero like strftime's %I"""
+    return f"{dt.hour % 12 or 12}:{dt.minute:02d} {'am' if dt.hour < 12 else 'pm'}"
+
+
+# Lookup-table for weather icons and weather codes
+WEATHER_ICONS = {
+    '01d': '\uf00d',
+    '02d': '\uf002',
+    '03d': '\uf013',
+    '04d': '\uf012',
+    '09d': '\uf01a',
+    '10d': '\uf019',
+    '11d': '\uf01e',
+    '13d': '\uf01b',
+    '50d': '\uf014',
+    '01n': '\uf02e',
+    '02n': '\uf013',
+    '03n': '\uf013',
+    '04n': '\uf013',
+    '09n': '\uf037',
+    '10n': '\uf036',
+    '11n': '\uf03b',
+    '13n': '\uf038',
+    '50n': '\uf023'
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _icon_sprite(path: str, icon: str, box_width: int, box_height: int) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Renders an icon once per box size as a coverage mask.
+
+    Returns the mask and its position inside the box. The same icons are drawn
+    at the same sizes on every refresh, so drawing the cached mask saves
+    rasterizing the glyph again.
+    """
+    font = _load_font(path, _fit_font_size(path, icon, box_width, box_height))
+    left, top, text_width, text_height = font.getbbox(icon)
+
+    # Align text to desired position
+    x = int((box_width / 2) - (text_width / 2))
+    y = int((box_height / 2) - (text_height / 2))
+
+    mask = Image.new('L', (text_width - left, text_height - top))
+    ImageDraw.Draw(mask).text((-left, -top), icon, fill=255, font=font)
+
+    # clip the glyph to the box, so it doesn't bleed into neighbouring cells
+    x, y = x + left, y + top
+    mask = mask.crop((max(-x, 0), max(-y, 0), min(mask.width, box_width - x), min(mask.height, box_height - y)))
+    return mask, (max(x, 0), max(y, 0))
+
+
+def draw_icon(draw: ImageDraw.ImageDraw, xy: Tuple[int, int], box_size: Tuple[int, int], icon: str,
+              font: ImageFont.FreeTypeFont):
+    """Custom function to add icons of weather font on the image.
+
+    Args:
+        - draw:
+            ImageDraw of the image on which the icon should be added
+        - xy:
+            coordinates as tuple -> (x,y)
+        - box_size:
+            size of text-box -> (width,height)
+        - icon:
+            icon-unicode, looks this up in weather-icons dictionary
+        - font:
+            the weather font, only its path is used
+
+    """
+
+    mask, (x, y) = _icon_sprite(font.path, icon, *box_size)
+    draw.bitmap((xy[0] + x, xy[1] + y), mask, fill='black')
+
+
+@functools.lru_cache(maxsize=1)
+def _internet_available(time_bucket: int) -> bool:
+    """Checks the connection at most once per time bucket, e.g. monotonic seconds // 30"""
+    return internet_available()
+
+
+class _TTLCache:
+    """Keeps values only for a given number of seconds"""
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, key):
+        """Returns the value for key, or None if it is missing or expired"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def set(self, key, value, ttl: float):
+        """Stores value for key for ttl seconds and drops expired entries"""
+        now = time.monotonic()
+        # expired keys are not requested again, e.g. daily forecasts of past days
+        for expired_key in [k for k, entry in list(self._entries.items()) if entry[0] <= now]:
+            self._entries.pop(expired_key, None)
+        self._entries[key] = (now + ttl, value)
+
+
 class Weather(inkycal_module):
     """Weather class
     parses weather details from openweathermap
@@ -124,6 +302,15 @@ class Weather(inkycal_module):
             tz_name=self.timezone
         )
 
+        # OpenWeatherMap updates its data only every few minutes, so keep
+        # responses for a while instead of requesting them on every refresh
+        self._owm_cache = _TTLCache()
+
+        self._compute_layout()
+
+        # copying a blank image is a plain memcpy, cheaper than filling a new one
+        self._blank_image = Image.new('RGB', size=self._im_size, color='white')
+
         self.weatherfont = ImageFont.truetype(
             fonts['weathericons-regular-webfont'], size=self.fontsize)
 
@@ -142,165 +329,39 @@ class Weather(inkycal_module):
         elif self.temp_unit == "celsius":
             self.tempDispUnit = "°"
 
-        # give an OK message
-        logger.debug(f"{__name__} loaded")
+        # Set decimals
+        dec_temp = 0 if self.round_temperature == True else 1
+        dec_wind = 0 if self.round_wind_speed == True else 1
 
-    def generate_image(self):
-        """Generate image for this module"""
+        logging.debug(f'temperature unit: {self.temp_unit}')
+        logging.debug(f'decimals temperature: {dec_temp} | decimals wind: {dec_wind}')
 
-        # Define new image size with respect to padding
-        im_width = int(self.width - (2 * self.padding_left))
-        im_height = int(self.height - (2 * self.padding_top))
-        im_size = im_width, im_height
-        logger.debug(f'Image size: {im_size}')
+        # Format strings for temperatures and wind speed, e.g. 21.5° or 3 m/s
+        self._temp_format = f'{{:.{dec_temp}f}}{self.tempDispUnit}'
+        self._temp_range_format = f'{self._temp_format}/{self._temp_format}'
+        self._wind_format = f'{{:.{dec_wind}f}} {self.windDispUnit}'
 
-        # Create an image for black pixels and one for coloured pixels
-        im_black = Image.new('RGB', size=im_size, color='white')
-        im_colour = Image.new('RGB', size=im_size, color='white')
+        # give an OK message
+        logger.debug(f"{__name__} loaded")
 
-        # Check if internet is available
-        if internet_available():
-            logger.debug('Connection test passed')
+    def _cached_owm_call(self, key, ttl: float, request, *args):
+        """Returns the cached response for key, or calls request and caches its response for ttl seconds"""
+        response = self._owm_cache.get(key)
+        if response is None:
+            response = request(*args)
+            self._owm_cache.set(key, response, ttl)
         else:
-            logger.error("Network not reachable. Please check your connection.")
-            raise NetworkNotReachableError
+            logger.debug(f'using cached OpenWeatherMap response for {key}')
+        return response
 
-        def get_moon_phase():
-            """Calculate the current (approximate) moon phase
-
-            Returns:
-                The corresponding moonphase-icon.
-            """
-
-            dec = decimal.Decimal
-            diff = now - arrow.get(2001, 1, 1)
-            days = dec(diff.days) + (dec(diff.seconds) / dec(86400))
-            lunations = dec("0.20439731") + (days * dec("0.03386319269"))
-            position = lunations % dec(1)
-            index = math.floor((position * dec(8)) + dec("0.5"))
-            return {
-                0: '\uf095',
-                1: '\uf099',
-                2: '\uf09c',
-                3: '\uf0a0',
-                4: '\uf0a3',
-                5: '\uf0a7',
-                6: '\uf0aa',
-                7: '\uf0ae'
-            }[int(index) & 7]
-
-        def is_negative(temp: str):
-            """Check if temp is below freezing point of water (0°C/32°F)
-            returns True if temp below freezing point, else False"""
-            answer = False
-
-            if self.temp_unit == 'celsius' and round(float(temp.split(self.tempDispUnit)[0])) <= 0:
-                answer = True
-            elif self.temp_unit == 'fahrenheit' and round(float(temp.split(self.tempDispUnit)[0])) <= 32:
-                answer = True
-            return answer
-
-        # Lookup-table for weather icons and weather codes
-        weather_icons = {
-            '01d': '\uf00d',
-            '02d': '\uf002',
-            '03d': '\uf013',
-            '04d': '\uf012',
-            '09d': '\uf01a',
-            '10d': '\uf019',
-            '11d': '\uf01e',
-            '13d': '\uf01b',
-            '50d': '\uf014',
-            '01n': '\uf02e',
-            '02n': '\uf013',
-            '03n': '\uf013',
-            '04n': '\uf013',
-            '09n': '\uf037',
-            '10n': '\uf036',
-            '11n': '\uf03b',
-            '13n': '\uf038',
-            '50n': '\uf023'
-        }
+    def _compute_layout(self):
+        """Calculates the positions of all elements, they only depend on the module size"""
 
-        def draw_icon(image: Image, xy: Tuple[int, int], box_size: Tuple[int, int], icon: str, rotation=None):
-            """Custom function to add icons of weather font on the image.
-
-            Args:
-                - image:
-                    the image on which image should the text be added
-                - xy:
-                    coordinates as tuple -> (x,y)
-                - box_size:
-                    size of text-box -> (width,height)
-                - icon:
-                    icon-unicode, looks this up in weather-icons dictionary
-
-            """
-
-            icon_size_correction = {
-                '\uf00d': 10 / 60,
-                '\uf02e': 51 / 150,
-                '\uf019': 21 / 60,
-                '\uf01b': 21 / 60,
-                '\uf0b5': 51 / 150,
-                '\uf050': 25 / 60,
-                '\uf013': 51 / 150,
-                '\uf002': 0,
-                '\uf031': 29 / 100,
-                '\uf015': 21 / 60,
-                '\uf01e': 52 / 150,
-                '\uf056': 51 / 150,
-                '\uf053': 14 / 150,
-                '\uf012': 51 / 150,
-                '\uf01a': 51 / 150,
-                '\uf014': 51 / 150,
-                '\uf037': 42 / 150,
-                '\uf036': 42 / 150,
-                '\uf03b': 42 / 150,
-                '\uf038': 42 / 150,
-                '\uf023': 35 / 150,
-                '\uf07a': 35 / 150,
-                '\uf051': 18 / 150,
-                '\uf052': 18 / 150,
-                '\uf0aa': 0,
-                '\uf095': 0,
-                '\uf099': 0,
-                '\uf09c': 0,
-                '\uf0a0': 0,
-                '\uf0a3': 0,
-                '\uf0a7': 0,
-                '\uf0ae': 0
-            }
-
-            x, y = xy
-            box_width, box_height = box_size
-            text = icon
-            font = self.weatherfont
-
-            # Increase fontsize to fit specified height and width of text box
-            size = 8
-            font = ImageFont.truetype(font.path, size)
-            text_width, text_height = font.getbbox(text)[2:]
-
-            while text_width < int(box_width * 0.9) and text_height < int(box_height * 0.9):
-                size += 1
-                font = ImageFont.truetype(font.path, size)
-                text_width, text_height = font.getbbox(text)[2:]
-
-            text_width, text_height = font.getbbox(text)[2:]
-
-            # Align text to desired position
-            x = int((box_width / 2) - (text_width / 2))
-            y = int((box_height / 2) - (text_height / 2))
-
-            space = Image.new('RGBA', (box_width, box_height))
-            ImageDraw.Draw(space).text((x, y), text, fill='black', font=font)
-
-            if rotation:
-                space.rotate(rotation, expand=True)
-
-            # Update only region with text (add text with transparent background)
-            image.paste(space, xy, space)
+        # Define new image size with respect to padding
+        self._im_width = int(self.width - (2 * self.padding_left))
+        self._im_height = int(self.height - (2 * self.padding_top))
+        self._im_size = self._im_width, self._im_height
+        logger.debug(f'Image size: {self._im_size}')
 
         #   column1    column2    column3    column4    column5    column6    column7
         # |----------|----------|----------|----------|----------|----------|----------|
@@ -312,43 +373,34 @@ class Weather(inkycal_module):
         # |----------|----------|----------|----------|----------|----------|----------|
 
         # Calculate size rows and columns
-        col_width = im_width // 7
+        self._col_width = self._im_width // 7
 
         # Ratio width height
-        image_ratio = im_width / im_height
+        image_ratio = self._im_width / self._im_height
 
         if image_ratio >= 4:
-            row_height = im_height // 3
+            self._row_height = self._im_height // 3
         else:
             logger.info('Please consider decreasing the height.')
-            row_height = int((im_height * (1 - im_height / im_width)) / 3)
+            self._row_height = int((self._im_height * (1 - self._im_height / self._im_width)) / 3)
 
-        logger.debug(f"row_height: {row_height} | col_width: {col_width}")
+        logger.debug(f"row_height: {self._row_height} | col_width: {self._col_width}")
 
         # Calculate spacings for better centering
-        spacing_top = int((im_width % col_width) / 2)
-        spacing_left = int((im_height % row_height) / 2)
+        self._spacing_top = int((self._im_width % self._col_width) / 2)
 
         # Define sizes for weather icons
-        icon_small = int(col_width / 3)
-        icon_medium = icon_small * 2
-        icon_large = icon_small * 3
+        self._icon_small = int(self._col_width / 3)
 
         # Calculate the x-axis position of each col
-        col1 = spacing_top
-        col2 = col1 + col_width
-        col3 = col2 + col_width
-        col4 = col3 + col_width
-        col5 = col4 + col_width
-        col6 = col5 + col_width
-        col7 = col6 + col_width
+        self._cols = [self._spacing_top + i * self._col_width for i in range(7)]
 
         # Calculate the y-axis position of each row
-        line_gap = int((im_height - spacing_top - 3 * row_height) // 4)
+        self._line_gap = int((self._im_height - self._spacing_top - 3 * self._row_height) // 4)
 
-        row1 = line_gap
-        row2 = row1 + line_gap + row_height
-        row3 = row2 + line_gap + row_height
+        self._row1 = self._line_gap
+        self._row2 = self._row1 + self._line_gap + self._row_height
+        self._row3 = self._row2 + self._line_gap + self._row_height
 
         # Draw lines on each row and border
         ###########################################################################
@@ -364,55 +416,63 @@ class Weather(inkycal_module):
         ###########################################################################
 
         # Positions for current weather details
-        weather_icon_pos = (col1, 0)
-        temperature_icon_pos = (col2, row1)
-        temperature_pos = (col2 + icon_small, row1)
-        humidity_icon_pos = (col2, row2)
-        humidity_pos = (col2 + icon_small, row2)
-        windspeed_icon_pos = (col2, row3)
-        windspeed_pos = (col2 + icon_small, row3)
+        self._weather_icon_pos = (self._cols[0], 0)
+        self._temperature_icon_pos = (self._cols[1], self._row1)
+        self._temperature_pos = (self._cols[1] + self._icon_small, self._row1)
+        self._humidity_icon_pos = (self._cols[1], self._row2)
+        self._humidity_pos = (self._cols[1] + self._icon_small, self._row2)
+        self._windspeed_icon_pos = (self._cols[1], self._row3)
+        self._windspeed_pos = (self._cols[1] + self._icon_small, self._row3)
 
         # Positions for sunrise, sunset, moonphase
-        moonphase_pos = (col3, row1)
-        sunrise_icon_pos = (col3, row2)
-        sunrise_time_pos = (col3 + icon_small, row2)
-        sunset_icon_pos = (col3, row3)
-        sunset_time_pos = (col3 + icon_small, row3)
-
-        # Positions for forecast 1
-        stamp_fc1 = (col4, row1) # noqa
-        icon_fc1 = (col4, row1 + row_height) # noqa
-        temp_fc1 = (col4, row3) # noqa
-
-        # Positions for forecast 2
-        stamp_fc2 = (col5, row1) # noqa
-        icon_fc2 = (col5, row1 + row_height) # noqa
-        temp_fc2 = (col5, row3) # noqa
-
-        # Positions for forecast 3
-        stamp_fc3 = (col6, row1) # noqa
-        icon_fc3 = (col6, row1 + row_height) # noqa
-        temp_fc3 = (col6, row3) # noqa
-
-        # Positions for forecast 4
-        stamp_fc4 = (col7, row1) # noqa
-        icon_fc4 = (col7, row1 + row_height) # noqa
-        temp_fc4 = (col7, row3) # noqa
+        self._moonphase_pos = (self._cols[2], self._row1)
+        self._sunrise_icon_pos = (self._cols[2], self._row2)
+        self._sunrise_time_pos = (self._cols[2] + self._icon_small, self._row2)
+        self._sunset_icon_pos = (self._cols[2], self._row3)
+        self._sunset_time_pos = (self._cols[2] + self._icon_small, self._row3)
 
-        # Create current-weather and weather-forecast objects
-        logging.debug('looking up location by ID')
-        current_weather = self.owm.get_current_weather()
-        weather_forecasts = self.owm.get_weather_forecast()
+        # Positions for forecasts 1-4
+        self._stamp_positions = [(col, self._row1) for col in self._cols[3:]]
+        self._icon_positions = [(col, self._row1 + self._row_height) for col in self._cols[3:]]
+        self._temp_positions = [(col, self._row3) for col in self._cols[3:]]
 
-        # Set decimals
-        dec_temp = 0 if self.round_temperature == True else 1
-        dec_wind = 0 if self.round_wind_speed == True else 1
+    def generate_image(self):
+        """Generate image for this module"""
 
-        logging.debug(f'temperature unit: {self.temp_unit}')
-        logging.debug(f'decimals temperature: {dec_temp} | decimals wind: {dec_wind}')
+        # Create an image for black pixels and one for coloured pixels
+        im_black = self._blank_image.copy()
+        im_colour = self._blank_image.copy()
+
+        # OpenWeatherMap requests as (cache key, cache duration in seconds, request, *args)
+        current_weather_request = ('current', 600, self.owm.get_current_weather)
+        if self.forecast_interval == 'hourly':
+            forecast_requests = [('hourly', 1800, self.owm.get_weather_forecast)]
+        elif self.forecast_interval == 'daily':
+            # days are counted from today, so the key includes the date
+            forecast_requests = [(('daily', date.today(), days), 3600, self.owm.get_forecast_for_day, days)
+                                 for days in range(1, 5)]
+        else:
+            forecast_requests = []
+
+        # Check if internet is available, unless all responses are still cached
+        owm_requests = [current_weather_request, *forecast_requests]
+        if all(self._owm_cache.get(request[0]) is not None for request in owm_requests):
+            logger.debug('Using cached OpenWeatherMap responses, skipping connection test')
+        elif _internet_available(int(time.monotonic() // 30)):
+            logger.debug('Connection test passed')
+        else:
+            logger.error("Network not reachable. Please check your connection.")
+            raise NetworkNotReachableError
+
+        # Create current-weather and weather-forecast objects
+        # The requests mostly wait for the network, so send them concurrently
+        logging.debug('looking up location by ID')
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            current_weather_future = executor.submit(self._cached_owm_call, *current_weather_request)
+            forecast_futures = [executor.submit(self._cached_owm_call, *request) for request in forecast_requests]
 
         # Get current time
-        now = arrow.utcnow().to(self.timezone)
+        now = datetime.now(timezone.utc)
 
         fc_data = {}
 
@@ -422,9 +482,10 @@ class Weather(inkycal_module):
 
             # Add next 4 forecasts to fc_data dictionary, since we only have
             fc_data = {}
+            weather_forecasts = forecast_futures[0].result()
             for index, forecast in enumerate(weather_forecasts[0:4]):
                 fc_data['fc' + str(index + 1)] = {
-                    'temp': f"{forecast['temp']:.{dec_temp}f}{self.tempDispUnit}",
+                    'temp': self._temp_format.format(forecast['temp']),
                     'icon': forecast["icon"],
                     'stamp': forecast["datetime"].strftime("%I %p" if self.hour_format == 12 else "%H:%M")
                 }
@@ -433,13 +494,13 @@ class Weather(inkycal_module):
 
             logger.debug("getting daily forecasts")
 
-            daily_forecasts = [self.owm.get_forecast_for_day(days) for days in range(1, 5)]
+            daily_forecasts = [future.result() for future in forecast_futures]
 
             for index, forecast in enumerate(daily_forecasts):
                 fc_data['fc' + str(index + 1)] = {
-                    'temp': f'{forecast["temp_min"]:.{dec_temp}f}{self.tempDispUnit}/{forecast["temp_max"]:.{dec_temp}f}{self.tempDispUnit}',
+                    'temp': self._temp_range_format.format(forecast['temp_min'], forecast['temp_max']),
                     'icon': forecast['icon'],
-                    'stamp': forecast['datetime'].strftime("%A")
+                    'stamp': arrow.get(forecast['datetime']).format('dddd', locale=self.locale)
                 }
         else:
             logger.error(f"Invalid forecast interval specified: {self.forecast_interval}. Check your settings!")
@@ -448,97 +509,94 @@ class Weather(inkycal_module):
             logger.debug((key, val))
 
         # Get some current weather details
+        current_weather = current_weather_future.result()
 
-        temperature = f"{current_weather['temp']:.{dec_temp}f}{self.tempDispUnit}"
+        temperature = self._temp_format.format(current_weather['temp'])
 
         weather_icon = current_weather["weather_icon_name"]
         humidity = str(current_weather["humidity"])
 
-        sunrise_raw = arrow.get(current_weather["sunrise"]).to(self.timezone)
-        sunset_raw = arrow.get(current_weather["sunset"]).to(self.timezone)
+        # already converted to our timezone by the OpenWeatherMap wrapper
+        sunrise_raw = current_weather["sunrise"]
+        sunset_raw = current_weather["sunset"]
 
         logger.debug(f'weather_icon: {weather_icon}')
 
         if self.hour_format == 12:
             logger.debug('using 12 hour format for sunrise/sunset')
-            sunrise = sunrise_raw.format('h:mm a')
-            sunset = sunset_raw.format('h:mm a')
+            sunrise = format_time_12h(sunrise_raw)
+            sunset = format_time_12h(sunset_raw)
         else:
             # 24 hours format
             logger.debug('using 24 hour format for sunrise/sunset')
-            sunrise = sunrise_raw.format('H:mm')
-            sunset = sunset_raw.format('H:mm')
+            sunrise = f'{sunrise_raw.hour}:{sunrise_raw.minute:02d}'
+            sunset = f'{sunset_raw.hour}:{sunset_raw.minute:02d}'
 
         # Format the wind-speed to user preference
         logging.debug(f'getting wind speed in {self.windDispUnit}')
-        wind = f"{current_weather['wind']:.{dec_wind}f} {self.windDispUnit}"
+        wind = self._wind_format.format(current_weather['wind'])
+
+        moon_phase = get_moon_phase(now)
 
-        moon_phase = get_moon_phase()
+        # all icons are drawn in colour
+        draw_colour = ImageDraw.Draw(im_colour)
 
         # Fill weather details in col 1 (current weather icon)
-        draw_icon(im_colour, weather_icon_pos, (col_width, im_height),
-                  weather_icons[weather_icon])
+        draw_icon(draw_colour, self._weather_icon_pos, (self._col_width, self._im_height),
+                  WEATHER_ICONS[weather_icon], self.weatherfont)
 
         # Fill weather details in col 2 (temp, humidity, wind)
-        draw_icon(im_colour, temperature_icon_pos, (icon_small, row_height),
-                  '\uf053')
+        draw_icon(draw_colour, self._temperature_icon_pos, (self._icon_small, self._row_height),
+                  '\uf053', self.weatherfont)
 
-        if is_negative(temperature):
-            write(im_black, temperature_pos, (col_width - icon_small, row_height),
-                  temperature, font=self.font)
-        else:
-            write(im_black, temperature_pos, (col_width - icon_small, row_height),
-                  temperature, font=self.font)
+        write(im_black, self._temperature_pos, (self._col_width - self._icon_small, self._row_height),
+              temperature, font=self.font)
 
-        draw_icon(im_colour, humidity_icon_pos, (icon_small, row_height),
-                  '\uf07a')
+        draw_icon(draw_colour, self._humidity_icon_pos, (self._icon_small, self._row_height),
+                  '\uf07a', self.weatherfont)
 
-        write(im_black, humidity_pos, (col_width - icon_small, row_height),
+        write(im_black, self._humidity_pos, (self._col_width - self._icon_small, self._row_height),
               humidity + '%', font=self.font)
 
-        draw_icon(im_colour, windspeed_icon_pos, (icon_small, icon_small),
-                  '\uf050')
+        draw_icon(draw_colour, self._windspeed_icon_pos, (self._icon_small, self._icon_small),
+                  '\uf050', self.weatherfont)
 
-        write(im_black, windspeed_pos, (col_width - icon_small, row_height),
+        write(im_black, self._windspeed_pos, (self._col_width - self._icon_small, self._row_height),
               wind, font=self.font)
 
         # Fill weather details in col 3 (moonphase, sunrise, sunset)
-        draw_icon(im_colour, moonphase_pos, (col_width, row_height), moon_phase)
+        draw_icon(draw_colour, self._moonphase_pos, (self._col_width, self._row_height), moon_phase, self.weatherfont)
 
-        draw_icon(im_colour, sunrise_icon_pos, (icon_small, icon_small), '\uf051')
-        write(im_black, sunrise_time_pos, (col_width - icon_small, row_height),
+        draw_icon(draw_colour, self._sunrise_icon_pos, (self._icon_small, self._icon_small), '\uf051', self.weatherfont)
+        write(im_black, self._sunrise_time_pos, (self._col_width - self._icon_small, self._row_height),
               sunrise, font=self.font)
 
-        draw_icon(im_colour, sunset_icon_pos, (icon_small, icon_small), '\uf052')
-        write(im_black, sunset_time_pos, (col_width - icon_small, row_height), sunset,
+        draw_icon(draw_colour, self._sunset_icon_pos, (self._icon_small, self._icon_small), '\uf052', self.weatherfont)
+        write(im_black, self._sunset_time_pos, (self._col_width - self._icon_small, self._row_height), sunset,
               font=self.font)
 
         # Add the forecast data to the correct places
-        for pos in range(1, len(fc_data) + 1):
-            stamp = fc_data[f'fc{pos}']['stamp']
-            # check if we're using daily forecasts
-            if "day" in stamp:
-                stamp = arrow.get(fc_data[f'fc{pos}']['stamp'], "dddd").format("dddd", locale=self.locale)
-
-            icon = weather_icons[fc_data[f'fc{pos}']['icon']]
-            temp = fc_data[f'fc{pos}']['temp']
+        for i, forecast in enumerate(fc_data.values()):
+            stamp = forecast['stamp']
+            icon = WEATHER_ICONS[forecast['icon']]
+            temp = forecast['temp']
 
-            write(im_black, eval(f'stamp_fc{pos}'), (col_width, row_height),
+            write(im_black, self._stamp_positions[i], (self._col_width, self._row_height),
                   stamp, font=self.font)
-            draw_icon(im_colour, eval(f'icon_fc{pos}'), (col_width, row_height + line_gap * 2),
-                      icon)
-            write(im_black, eval(f'temp_fc{pos}'), (col_width, row_height),
+            draw_icon(draw_colour, self._icon_positions[i], (self._col_width, self._row_height + self._line_gap * 2),
+                      icon, self.weatherfont)
+            write(im_black, self._temp_positions[i], (self._col_width, self._row_height),
                   temp, font=self.font)
 
-        border_h = row3 + row_height
-        border_w = col_width - 3  # leave 3 pixels gap
+        border_h = self._row3 + self._row_height
+        border_w = self._col_width - 3  # leave 3 pixels gap
 
         # Add borders around each subsection
-        draw_border(im_black, (col1, row1), (col_width * 3 - 3, border_h),
+        draw_border(im_black, (self._cols[0], self._row1), (self._col_width * 3 - 3, border_h),
                     shrinkage=(0, 0))
 
-        for _ in range(4, 8):
-            draw_border(im_black, (eval(f'col{_}'), row1), (border_w, border_h),
+        for col in self._cols[3:]:
+            draw_border(im_black, (col, self._row1), (border_w, border_h),
                         shrinkage=(0, 0))
 
         # return the images ready for the display
@@ -22,6 +22,9 @@ __url__ = "https://github.com/aceinnolab/Inkycal"
 
 __install_requires__ = required
 
+# numba speeds up dithering for black-white-red/yellow displays, but is not available everywhere
+__extras_require__ = {"numba": ["numba"]}
+
 __classifiers__ = [
     "Development Status :: 4 - Beta",
     "License :: OSI Approved :: GNU General Public License v3 (GPLv3)",
@@ -39,6 +42,7 @@ setup(
     author_email=__author_email__,
     url=__url__,
     install_requires=__install_requires__,
+    extras_require=__extras_require__,
     classifiers=__classifiers__,
     long_description=long_description,
     long_description_content_type='text/markdown',
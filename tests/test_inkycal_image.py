@@ -1,22 +1,33 @@
 """
 inkycal_image unittest
 """
+import io
+import json
 import logging
+import os
+import tempfile
 import unittest
+from unittest import mock
 
+import numpy
 import requests
 from PIL import Image
 
 from inkycal.modules import Inkyimage as Module
+from inkycal.modules._dither import _fs_dither_bwr
+from inkycal.modules._dither import fs_dither_bwr
 from inkycal.modules.inky_image import Inkyimage
+from inkycal.modules.inky_image import URL_CACHE_MAX_AGE
+from inkycal.modules.inky_image import _cached_file_path
+from inkycal.modules.inky_image import _get_palette
+from inkycal.modules.inky_image import image_to_palette
+from inkycal.settings import Settings
 from tests import Config
 
 merge = Inkyimage.merge
 
 url ="https://raw.githubusercontent.com/aceinnolab/Inkycal/assets/tests/Inkycal_cover.png"
 
-im = Image.open(requests.get(url, stream=True).raw)
-im.save("test.png", "PNG")
 test_path = "test.png"
 
 logger = logging.getLogger(__name__)
@@ -105,6 +116,11 @@ tests = [
 
 class TestInkyImage(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        im = Image.open(requests.get(url, stream=True).raw)
+        im.save(test_path, "PNG")
+
     def test_generate_image(self):
         for test in tests:
             logger.info(f'test {tests.index(test) + 1} generating image..')
@@ -113,3 +129,200 @@ class TestInkyImage(unittest.TestCase):
             logger.info('OK')
             if Config.USE_PREVIEW:
                 merge(im_black, im_colour).show()
+
+
+class TestImageToPaletteRaw(unittest.TestCase):
+
+    def setUp(self):
+        # 13 pixels wide, so each row is padded by 3 bits
+        self.image = Image.new("RGB", (13, 2), "white")
+        self.image.putpixel((0, 0), (0, 0, 0))
+        self.image.putpixel((12, 0), (255, 0, 0))
+
+    def test_packed_shape(self):
+        im_black, im_colour = image_to_palette(self.image, "bwr", dither=False, raw=True)
+        self.assertEqual(im_black.shape, (2, 2))
+        self.assertEqual(im_colour.shape, (2, 2))
+        self.assertEqual(im_black.dtype, numpy.uint8)
+
+    def test_bit_order_and_padding(self):
+        im_black, im_colour = image_to_palette(self.image, "bwr", dither=False, raw=True)
+        # the leftmost pixel is the most significant bit, 1 is white, padding is white
+        self.assertEqual(im_black.tolist(), [[0b01111111, 0b11111111], [0xFF, 0xFF]])
+        self.assertEqual(im_colour.tolist(), [[0b11111111, 0b11110111], [0xFF, 0xFF]])
+
+    def test_bw(self):
+        im_black, im_colour = image_to_palette(self.image, "bw", dither=False, raw=True)
+        self.assertEqual(im_black.shape, (2, 2))
+        self.assertEqual(im_black[0, 0], 0b01111111)
+        self.assertTrue((im_colour == 0xFF).all())
+
+    def test_16gray_not_supported(self):
+        with self.assertRaises(ValueError):
+            image_to_palette(self.image, "16gray", raw=True)
+
+
+def mock_response(status_code, content=b"", headers=None):
+    response = mock.Mock(status_code=status_code, content=content, headers=headers or {})
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status_code} Error")
+    return response
+
+
+class TestDownload(unittest.TestCase):
+
+    def setUp(self):
+        # keep the downloaded files and their etags out of the real cache
+        self.cache_dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(Settings, "CACHE_PATH", self.cache_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.cache_dir.cleanup)
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (4, 3), "red").save(buffer, "PNG")
+        self.png = buffer.getvalue()
+        self.url = "https://example.com/image.png"
+
+    @mock.patch("inkycal.modules.inky_image.requests.get")
+    def test_revalidates_with_etag(self, get):
+        get.return_value = mock_response(200, self.png, {"ETag": '"abc"'})
+        im = Inkyimage()
+        im.load(self.url)
+        self.assertEqual(im.image.size, (4, 3))
+        self.assertNotIn("If-None-Match", get.call_args.kwargs["headers"])
+
+        # the second request sends the etag, a 304 is answered from the cache
+        get.return_value = mock_response(304)
+        im = Inkyimage()
+        im.load(self.url)
+        self.assertEqual(get.call_args.kwargs["headers"]["If-None-Match"], '"abc"')
+        self.assertEqual(im.image.size, (4, 3))
+        self.assertEqual(im.image.getpixel((0, 0)), (255, 0, 0))
+
+    def cached_urls(self):
+        with open(os.path.join(self.cache_dir.name, "inkycal_image_urls.json"), encoding="utf-8") as file:
+            return json.load(file)
+
+    @mock.patch("inkycal.modules.inky_image.requests.get")
+    def test_broken_cache(self, get):
+        # e.g. after a power loss while the cache was written
+        open(os.path.join(self.cache_dir.name, "inkycal_image_urls.json"), "w").close()
+        get.return_value = mock_response(200, self.png, {"ETag": '"abc"'})
+        im = Inkyimage()
+        im.load(self.url)
+        self.assertEqual(im.image.size, (4, 3))
+        # the broken index is replaced
+        self.assertIn(self.url, self.cached_urls())
+
+    @mock.patch("inkycal.modules.inky_image.time.time")
+    @mock.patch("inkycal.modules.inky_image.requests.get")
+    def test_unused_images_are_removed(self, get, time):
+        get.return_value = mock_response(200, self.png, {"ETag": '"abc"'})
+        time.return_value = 0
+        Inkyimage().load(self.url)
+        self.assertTrue(os.path.isfile(_cached_file_path(self.url)))
+
+        other_url = "https://example.com/image.png?t=1"
+        time.return_value = URL_CACHE_MAX_AGE + 1
+        Inkyimage().load(other_url)
+        self.assertFalse(os.path.isfile(_cached_file_path(self.url)))
+        self.assertTrue(os.path.isfile(_cached_file_path(other_url)))
+        self.assertEqual(list(self.cached_urls()), [other_url])
+
+    @mock.patch("inkycal.modules.inky_image.requests.get")
+    def test_response_without_validators(self, get):
+        get.return_value = mock_response(200, self.png, {"ETag": '"abc"'})
+        Inkyimage().load(self.url)
+        self.assertIn(self.url, self.cached_urls())
+
+        # the stale copy could never be revalidated again
+        get.return_value = mock_response(200, self.png)
+        Inkyimage().load(self.url)
+        self.assertEqual(self.cached_urls(), {})
+        self.assertFalse(os.path.isfile(_cached_file_path(self.url)))
+
+    @mock.patch("inkycal.modules.inky_image.requests.get")
+    def test_http_error(self, get):
+        get.return_value = mock_response(404)
+        with self.assertRaisesRegex(Exception, "check if the path points to an image file"):
+            Inkyimage().load(self.url)
+
+
+class TestResize(unittest.TestCase):
+
+    def resized(self, **kwargs):
+        im = Inkyimage(Image.new("RGB", (131, 97), "white"))
+        im.resize(**kwargs)
+        return im.image.size
+
+    def test_fit_inside_box(self):
+        # both sides given: the whole image fits inside the box
+        self.assertEqual(self.resized(width=30, height=200), (30, 22))
+        self.assertEqual(self.resized(width=200, height=30), (41, 30))
+        self.assertEqual(self.resized(width=262, height=194), (262, 194))
+
+    def test_width_only(self):
+        self.assertEqual(self.resized(width=30), (30, 22))
+
+    def test_height_only(self):
+        self.assertEqual(self.resized(height=200), (270, 200))
+
+
+class TestResample(unittest.TestCase):
+
+    def config(self, palette, **options):
+        return {"name": "Inkyimage", "config": dict(tests[2]["config"], palette=palette, **options)}
+
+    def test_default_filter(self):
+        self.assertEqual(Module(self.config("16gray")).resample, Image.LANCZOS)
+        self.assertEqual(Module(self.config("bwr")).resample, Image.BICUBIC)
+
+    def test_resample_option(self):
+        self.assertEqual(Module(self.config("bw", resample="lanczos")).resample, Image.LANCZOS)
+        self.assertEqual(Module(self.config("16gray", resample="bilinear")).resample, Image.BILINEAR)
+        # unknown filters keep the default
+        self.assertEqual(Module(self.config("bw", resample="nearest")).resample, Image.BICUBIC)
+
+    def test_filter_is_used_for_resizing(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = f"{tmpdir}/image.png"
+            Image.new("RGB", (131, 97), "white").save(path, "PNG")
+            module = Module(self.config("bw", path=path, resample="bilinear"))
+            with mock.patch.object(Inkyimage, "resize", autospec=True) as resize:
+                module.generate_image()
+        self.assertEqual(resize.call_args.kwargs["resample"], Image.BILINEAR)
+
+
+class TestDither(unittest.TestCase):
+
+    kernel = staticmethod(_fs_dither_bwr)
+
+    def setUp(self):
+        # the kernel expects the colour of the cached palette, which is ordered white, black, colour
+        palette_im, _, _, self.colour = _get_palette("bwr")
+        self.palette = numpy.array(palette_im.getpalette()[:9], dtype=numpy.float32).reshape(3, 3)
+
+    def dither(self, pixels):
+        return self.kernel(numpy.array(pixels, dtype=numpy.float32), self.colour)
+
+    def test_palette_order(self):
+        for index, rgb in enumerate(self.palette):
+            pixels = numpy.broadcast_to(rgb, (4, 4, 3))
+            self.assertTrue((self.dither(pixels) == index).all())
+
+    def test_gradient_keeps_mean_gray(self):
+        gradient = numpy.tile(numpy.linspace(0, 255, 64), (16, 1))
+        indices = self.dither(numpy.repeat(gradient[:, :, None], 3, axis=2))
+
+        # gray has no colour, so only white and black are used
+        self.assertEqual(set(numpy.unique(indices).tolist()), {0, 1})
+        gray = self.palette[indices, 0]
+        self.assertAlmostEqual(gray.mean(), gradient.mean(), delta=2)
+
+
+@unittest.skipUnless(fs_dither_bwr is not None, "numba is not installed")
+class TestCompiledDither(TestDither):
+    """Runs the same checks on the kernel compiled with numba, which is the one used"""
+
+    kernel = staticmethod(fs_dither_bwr)
@@ -3,7 +3,9 @@ Slideshow test (inkycal_slideshow)
 """
 import logging
 import os
+import tempfile
 import unittest
+from unittest import mock
 
 import requests
 from PIL import Image
@@ -14,18 +16,11 @@ from tests import Config
 
 merge = Inkyimage.merge
 
-if not os.path.exists("tmp"):
-    os.mkdir("tmp")
-
 im_urls = [
     "https://github.com/aceinnolab/Inkycal/raw/assets/Repo/coffee.png",
     "https://github.com/aceinnolab/Inkycal/raw/assets/Repo/coffee.png"
 ]
 
-for count, url in enumerate(im_urls):
-    im = Image.open(requests.get(url, stream=True).raw)
-    im.save(f"tmp/{count}.png", "PNG")
-
 test_path = "tmp"
 
 logger = logging.getLogger(__name__)
@@ -136,6 +131,14 @@ tests = [
 
 class TestSlideshow(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        if not os.path.exists("tmp"):
+            os.mkdir("tmp")
+        for count, url in enumerate(im_urls):
+            im = Image.open(requests.get(url, stream=True).raw)
+            im.save(f"tmp/{count}.png", "PNG")
+
     def test_generate_image(self):
         for test in tests:
             logger.info(f'test {tests.index(test) + 1} generating image..')
@@ -161,3 +164,25 @@ class TestSlideshow(unittest.TestCase):
             merge(im_black, im_colour).show()
 
         logger.info('OK')
+
+
+class TestResample(unittest.TestCase):
+
+    def setUp(self):
+        self.image_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.image_dir.cleanup)
+        Image.new("RGB", (131, 97), "white").save(f"{self.image_dir.name}/0.png", "PNG")
+
+    def config(self, palette, **options):
+        config = dict(tests[2]["config"], path=self.image_dir.name, palette=palette, **options)
+        return {"name": "Slideshow", "config": config}
+
+    def test_default_filter(self):
+        self.assertEqual(Slideshow(self.config("16gray")).resample, Image.LANCZOS)
+        self.assertEqual(Slideshow(self.config("bwr")).resample, Image.BICUBIC)
+
+    def test_filter_is_used_for_resizing(self):
+        module = Slideshow(self.config("bw", resample="bilinear"))
+        with mock.patch.object(Inkyimage, "resize", autospec=True) as resize:
+            module.generate_image()
+        self.assertEqual(resize.call_args.kwargs["resample"], Image.BILINEAR)
@@ -3,8 +3,22 @@ inkycal_weather unittest
 """
 import logging
 import unittest
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from unittest import mock
 
+from PIL import Image
+from PIL import ImageChops
+from PIL import ImageDraw
+from PIL import ImageFont
+
+from inkycal.custom.functions import fonts
 from inkycal.modules import Weather
+from inkycal.modules.inkycal_weather import WEATHER_ICONS
+from inkycal.modules.inkycal_weather import _TTLCache
+from inkycal.modules.inkycal_weather import _internet_available
+from inkycal.modules.inkycal_weather import draw_icon
 from inkycal.modules.inky_image import Inkyimage
 from tests import Config
 
@@ -183,3 +197,92 @@ class TestWeather(unittest.TestCase):
             if Config.USE_PREVIEW:
                 merged = merge(im_black, im_colour)
                 preview(merged)
+
+
+class TestTTLCache(unittest.TestCase):
+
+    @mock.patch("inkycal.modules.inkycal_weather.time.monotonic")
+    def test_expiry(self, monotonic):
+        cache = _TTLCache()
+        monotonic.return_value = 100
+        cache.set("current", {"temp": 20}, 600)
+
+        monotonic.return_value = 699
+        self.assertEqual(cache.get("current"), {"temp": 20})
+        monotonic.return_value = 700
+        self.assertIsNone(cache.get("current"))
+        self.assertIsNone(cache.get("missing"))
+
+    @mock.patch("inkycal.modules.inkycal_weather.time.monotonic")
+    def test_expired_entries_are_dropped(self, monotonic):
+        cache = _TTLCache()
+        monotonic.return_value = 0
+        cache.set(("daily", "2024-01-01", 1), "monday", 3600)
+
+        monotonic.return_value = 3600
+        cache.set(("daily", "2024-01-02", 1), "tuesday", 3600)
+        self.assertEqual(list(cache._entries), [("daily", "2024-01-02", 1)])
+
+    @mock.patch("inkycal.modules.inkycal_weather.time.monotonic")
+    def test_cached_owm_call(self, monotonic):
+        module = Weather(tests[0])
+        request = mock.Mock(return_value={"temp": 20})
+
+        monotonic.return_value = 0
+        self.assertEqual(module._cached_owm_call("current", 600, request), {"temp": 20})
+        monotonic.return_value = 599
+        self.assertEqual(module._cached_owm_call("current", 600, request), {"temp": 20})
+        request.assert_called_once_with()
+
+        # requested again once the response expired
+        monotonic.return_value = 600
+        module._cached_owm_call("current", 600, request)
+        self.assertEqual(request.call_count, 2)
+
+
+class TestConnectionCheck(unittest.TestCase):
+
+    def setUp(self):
+        _internet_available.cache_clear()
+        self.addCleanup(_internet_available.cache_clear)
+
+    def mock_owm(self, module):
+        now = datetime.now(timezone.utc)
+        module.owm.get_current_weather = mock.Mock(return_value={
+            "temp": 21.3, "weather_icon_name": "01d", "humidity": 60, "wind": 3.2,
+            "sunrise": now - timedelta(hours=5), "sunset": now + timedelta(hours=5),
+        })
+        module.owm.get_forecast_for_day = mock.Mock(side_effect=lambda days: {
+            "datetime": now + timedelta(days=days), "icon": "02d", "temp_min": 12.0, "temp_max": 22.0,
+        })
+
+    @mock.patch("inkycal.modules.inkycal_weather.internet_available", return_value=True)
+    def test_skipped_when_cached(self, internet_available):
+        module = Weather(tests[0])
+        self.mock_owm(module)
+
+        module.generate_image()
+        internet_available.assert_called_once_with()
+
+        # all responses are cached, so neither the connection nor OpenWeatherMap is checked again
+        _internet_available.cache_clear()
+        module.generate_image()
+        internet_available.assert_called_once_with()
+        module.owm.get_current_weather.assert_called_once_with()
+        self.assertEqual(module.owm.get_forecast_for_day.call_count, 4)
+
+
+class TestDrawIcon(unittest.TestCase):
+
+    def test_icon_stays_inside_box(self):
+        font = ImageFont.truetype(fonts['weathericons-regular-webfont'], size=12)
+        # in a flat box some glyphs are taller than the box
+        x, y, width, height = 50, 50, 64, 10
+        for icon in set(WEATHER_ICONS.values()):
+            image = Image.new('L', (200, 200), 255)
+            draw_icon(ImageDraw.Draw(image), (x, y), (width, height), icon, font)
+            left, top, right, bottom = ImageChops.invert(image).getbbox()
+            self.assertGreaterEqual(left, x, icon)
+            self.assertGreaterEqual(top, y, icon)
+            self.assertLessEqual(right, x + width, icon)
+            self.assertLessEqual(bottom, y + height, icon)